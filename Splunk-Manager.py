@@ -1,12 +1,20 @@
-import requests
-import urllib3
 import argparse
 import json
-import yaml
 import os
+import sys
 import time
+import re
+import fnmatch
+import threading
+from urllib.parse import quote
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+DEFAULT_TIMEOUT = 30          # seconds per HTTP request
+DEFAULT_MAX_IN_FLIGHT = 4     # concurrent requests per host
+DEFAULT_MAX_HOSTS = 16        # hosts worked on at once in fleet mode
+DEFAULT_RULES_DIR = os.path.join("detections", "rules")
+
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
 
 # ----- Config & Auth ----- #
 def load_config(config_path):
@@ -15,10 +23,57 @@ def load_config(config_path):
     with open(config_path, 'r') as f:
         return json.load(f)
 
-def get_session_key(base_url, username, password):
+def load_fleet_config(fleet_path):
+    """
+    Fleet config: {"defaults": {...}, "hosts": [{"host": ..., ...}, ...]}.
+    Each host entry inherits any key it doesn't set from "defaults".
+    """
+    fleet = load_config(fleet_path)
+    defaults = fleet.get("defaults", {})
+    targets = []
+    for entry in fleet.get("hosts", []):
+        target = {**defaults, **entry}
+        if not target.get("host"):
+            raise ValueError(f"Fleet entry without 'host' in {fleet_path}: {entry}")
+        target.setdefault("app", "search")
+        target.setdefault("name", target["host"])
+        targets.append(target)
+    if not targets:
+        raise ValueError(f"No hosts defined in fleet config: {fleet_path}")
+    return targets
+
+def get_http_session(config):
+    """
+    Pooled HTTP session per host. The pool blocks once `max_in_flight`
+    connections are busy, which caps concurrent requests against that host.
+    """
+    host = config["host"]
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(host)
+        if session is None:
+            # requests is only imported once a code path actually talks to Splunk
+            import requests
+            import urllib3
+            from requests.adapters import HTTPAdapter
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+            pool_size = int(config.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT))
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+            session = requests.Session()
+            session.verify = False
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSIONS[host] = session
+    return session
+
+def get_timeout(config):
+    return float(config.get("timeout", DEFAULT_TIMEOUT))
+
+def get_session_key(base_url, username, password, config=None):
+    config = config or {"host": base_url}
     login_url = f"{base_url}/services/auth/login"
     data = {"username": username, "password": password}
-    response = requests.post(login_url, data=data, verify=False)
+    response = get_http_session(config).post(login_url, data=data, timeout=get_timeout(config))
     if response.status_code != 200 or "<sessionKey>" not in response.text:
         raise Exception(f"Login failed: {response.text}")
     return "Splunk " + response.text.split("<sessionKey>")[1].split("</sessionKey>")[0]
@@ -27,30 +82,52 @@ def build_auth_header(config):
     if config.get("token"):
         return {"Authorization": f"Splunk {config['token']}"}
     elif config.get("username") and config.get("password"):
-        return {"Authorization": get_session_key(config["host"], config["username"], config["password"])}
+        return {"Authorization": get_session_key(config["host"], config["username"], config["password"], config)}
     else:
         raise ValueError("No valid authentication method found in config.")
 
 # ----- Saved Search Operations ----- #
-def toggle_saved_search(config, search_name, action, headers):
-    encoded_name = requests.utils.quote(search_name)
-    url = f"{config['host']}/servicesNS/admin/{config['app']}/saved/searches/{encoded_name}"
+def get_entry_edit_path(entry):
+    """
+    REST path for editing a listed saved search in its own owner/app namespace.
+    Searches shared into the app from elsewhere must not be edited under
+    servicesNS/admin/<app>, which fails or creates a local override.
+    """
+    edit_path = entry.get("links", {}).get("edit")
+    if edit_path:
+        return edit_path
+    acl = entry.get("acl", {})
+    if acl.get("owner") and acl.get("app"):
+        owner, app = quote(acl["owner"], safe=""), quote(acl["app"], safe="")
+        return f"/servicesNS/{owner}/{app}/saved/searches/{quote(entry.get('name', ''), safe='')}"
+    return None
+
+def toggle_saved_search(config, search_name, action, headers, verbose=True, edit_path=None):
+    if edit_path:
+        url = f"{config['host']}{edit_path}"
+    else:
+        encoded_name = quote(search_name)
+        url = f"{config['host']}/servicesNS/admin/{config['app']}/saved/searches/{encoded_name}"
     data = {"disabled": "0" if action == "enable" else "1"}
-    response = requests.post(url, headers=headers, data=data, verify=False)
+    response = get_http_session(config).post(url, headers=headers, data=data, timeout=get_timeout(config))
 
     if response.status_code != 200:
         raise Exception(f"Failed to {action} saved search:\n{response.text}")
 
-    print(f"[+] Successfully {action}d saved search: '{search_name}'")
+    if verbose:
+        print(f"[+] Successfully {action}d saved search: '{search_name}'")
 
-def list_saved_searches(config, headers):
-    url = f"{config['host']}/servicesNS/admin/{config['app']}/saved/searches?output_mode=json"
-    response = requests.get(url, headers=headers, verify=False)
+def fetch_saved_searches(config, headers):
+    url = f"{config['host']}/servicesNS/admin/{config['app']}/saved/searches?output_mode=json&count=0"
+    response = get_http_session(config).get(url, headers=headers, timeout=get_timeout(config))
 
     if response.status_code != 200:
         raise Exception(f"Failed to retrieve saved searches:\n{response.text}")
 
-    entries = response.json().get("entry", [])
+    return response.json().get("entry", [])
+
+def list_saved_searches(config, headers):
+    entries = fetch_saved_searches(config, headers)
     if not entries:
         print("[!] No saved searches found.")
         return
@@ -66,13 +143,18 @@ def list_saved_searches(config, headers):
     print(f"[+] Total: {len(entries)}")
 
 # ----- YAML Rule Support ----- #
+def import_rule_repository():
+    # The shared rule repository lives with the validation tooling
+    lib_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "detections", "tests")
+    if lib_dir not in sys.path:
+        sys.path.insert(0, lib_dir)
+    import rule_repository
+    return rule_repository
+
 def load_rule_yaml(rule_path):
-    if not os.path.exists(rule_path):
-        raise FileNotFoundError(f"Rule YAML file not found: {rule_path}")
-    with open(rule_path, 'r') as f:
-        return yaml.safe_load(f)
+    return import_rule_repository().load_rule_file(rule_path)
 
-def create_saved_search_from_yaml(config, rule_data, headers):
+def create_saved_search_from_yaml(config, rule_data, headers, verbose=True):
     url = f"{config['host']}/servicesNS/admin/{config['app']}/saved/searches"
 
     # Fix prefixing logic
@@ -97,18 +179,96 @@ def create_saved_search_from_yaml(config, rule_data, headers):
         if key.startswith("action.") or key.startswith("alert.") or key in ["is_scheduled"]:
             data[key] = str(rule_data[key])
 
-    response = requests.post(url, headers=headers, data=data, verify=False)
+    response = get_http_session(config).post(url, headers=headers, data=data, timeout=get_timeout(config))
 
     if response.status_code not in [200, 201]:
         raise Exception(f"Failed to create saved search:\n{response.text}")
 
-    print(f"[+] Alert saved search '{rule_data['name']}' created successfully.")
+    if verbose:
+        print(f"[+] Alert saved search '{rule_data['name']}' created successfully.")
 
     if rule_data.get("disabled", False):
-        toggle_saved_search(config, rule_data["name"], "disable", headers)
+        toggle_saved_search(config, rule_data["name"], "disable", headers, verbose)
+
+# ----- Bulk Toggle ----- #
+def has_bulk_selector(args):
+    return bool(args.pattern or args.regex or args.tag or args.owner or args.dry_run)
+
+def resolve_rule_names(rules_dir, tags=None, owner=None):
+    """
+    Names of YAML rules carrying any of `tags` and owned by `owner`.
+    """
+    rule_repository = import_rule_repository()
+    repository = rule_repository.load_rule_repository(rules_dir, schema_path=None)
+
+    matches = []
+    for tag in tags or [None]:
+        matches += rule_repository.find_rules(repository, tag=tag, owner=owner)
+    return {rule["name"] for _, rule in matches if isinstance(rule, dict) and rule.get("name")}
+
+def select_saved_searches(entries, args, rule_names=None):
+    """
+    Filter a single saved search listing down to the entries picked by
+    --search/--pattern/--regex (any may match) and --tag/--owner (via the YAML rules).
+    """
+    name_filter = args.search or args.pattern or args.regex
+    regex = re.compile(args.regex) if args.regex else None
+
+    selected = []
+    for entry in entries:
+        name = entry.get("name")
+        if name_filter:
+            if not (name == args.search
+                    or any(fnmatch.fnmatchcase(name, p) for p in args.pattern or [])
+                    or (regex and regex.search(name))):
+                continue
+        if rule_names is not None and name not in rule_names:
+            continue
+        selected.append(entry)
+    return selected
+
+def bulk_toggle_saved_searches(config, entries, action, headers, dry_run=False):
+    """
+    Toggle many saved searches concurrently over the host's pooled session.
+    Searches already in the requested state are skipped. Returns table rows.
+    """
+    host = config.get("name", config["host"])
+    want_disabled = action == "disable"
+
+    def toggle(entry):
+        name = entry.get("name")
+        if bool(entry.get("content", {}).get("disabled", False)) == want_disabled:
+            return {"host": host, "status": "SKIPPED", "name": name, "detail": f"already {action}d"}
+        if dry_run:
+            return {"host": host, "status": "DRY-RUN", "name": name, "detail": f"would {action}"}
+        try:
+            toggle_saved_search(config, name, action, headers, verbose=False,
+                                edit_path=get_entry_edit_path(entry))
+            return {"host": host, "status": "OK", "name": name, "detail": f"{action}d"}
+        except Exception as e:
+            return {"host": host, "status": "ERROR", "name": name, "detail": " ".join(str(e).split())[:200]}
+
+    if not entries:
+        return [{"host": host, "status": "EMPTY", "name": "", "detail": "No saved searches matched."}]
+
+    from concurrent.futures import ThreadPoolExecutor
+    max_workers = int(config.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        rows = list(executor.map(toggle, entries))
+    return sorted(rows, key=lambda r: r["name"])
+
+def run_bulk_toggle(config, args, headers, rule_names=None):
+    entries = select_saved_searches(fetch_saved_searches(config, headers), args, rule_names)
+    return bulk_toggle_saved_searches(config, entries, args.action, headers, args.dry_run)
+
+def print_toggle_summary(rows):
+    counts = {}
+    for r in rows:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    print("[+] Summary: " + ", ".join(f"{status}={count}" for status, count in sorted(counts.items())))
 
 # ----- Search Query Execution ----- #
-def run_search_query(config, query, headers):
+def fetch_search_results(config, query, headers, verbose=True):
     search_url = f"{config['host']}/services/search/jobs"
     if not query.strip().startswith(("search", "|", "tstats", "inputlookup", "from")):
         query = f"search {query}"
@@ -120,8 +280,12 @@ def run_search_query(config, query, headers):
         "output_mode": "json"
     }
 
-    print(f"[>] Starting async search job: {query}")
-    response = requests.post(search_url, headers=headers, data=data, verify=False)
+    session = get_http_session(config)
+    timeout = get_timeout(config)
+
+    if verbose:
+        print(f"[>] Starting async search job: {query}")
+    response = session.post(search_url, headers=headers, data=data, timeout=timeout)
     if response.status_code != 201:
         raise Exception(f"Failed to create search job:\n{response.text}")
 
@@ -129,14 +293,16 @@ def run_search_query(config, query, headers):
     if not sid:
         raise Exception("No SID returned for search job.")
 
-    print(f"[+] Search SID: {sid}. Waiting for completion...")
+    if verbose:
+        print(f"[+] Search SID: {sid}. Waiting for completion...")
 
     # Poll for job completion
     job_url = f"{config['host']}/services/search/jobs/{sid}"
     for _ in range(60):
-        job_status = requests.get(job_url, headers=headers, verify=False, params={"output_mode": "json"}).json()
+        job_status = session.get(job_url, headers=headers, params={"output_mode": "json"}, timeout=timeout).json()
         if job_status["entry"][0]["content"]["isDone"]:
-            print("[+] Search job completed.")
+            if verbose:
+                print("[+] Search job completed.")
             break
         time.sleep(2)
     else:
@@ -144,11 +310,14 @@ def run_search_query(config, query, headers):
 
     # Get results
     results_url = f"{job_url}/results"
-    result_resp = requests.get(results_url, headers=headers, verify=False, params={"output_mode": "json", "count": 10})  # limit results
+    result_resp = session.get(results_url, headers=headers, params={"output_mode": "json", "count": 10}, timeout=timeout)  # limit results
     if result_resp.status_code != 200:
         raise Exception(f"Failed to fetch results:\n{result_resp.text}")
 
-    results = result_resp.json().get("results", [])
+    return result_resp.json().get("results", [])
+
+def run_search_query(config, query, headers):
+    results = fetch_search_results(config, query, headers)
     if not results:
         print("[!] No results found.")
         return
@@ -157,6 +326,82 @@ def run_search_query(config, query, headers):
     for row in results:
         print(json.dumps(row, indent=2))
 
+# ----- Fleet Operations ----- #
+def run_action_on_host(target, args, rule_data=None, rule_names=None):
+    """
+    Run one CLI action against a single fleet host and return table rows.
+    Failures are reported as an ERROR row so other hosts are unaffected; the
+    row names the search when the host was reachable but that search failed.
+    """
+    host = target["name"]
+    name = ""
+    try:
+        headers = build_auth_header(target)
+
+        if args.action == "list":
+            rows = []
+            for entry in fetch_saved_searches(target, headers):
+                disabled = entry.get("content", {}).get("disabled", True)
+                rows.append({"host": host, "status": "DISABLED" if disabled else "ENABLED",
+                             "name": entry.get("name"), "detail": ""})
+            return rows or [{"host": host, "status": "EMPTY", "name": "", "detail": "No saved searches found."}]
+        elif args.action in ["enable", "disable"]:
+            if has_bulk_selector(args):
+                return run_bulk_toggle(target, args, headers, rule_names)
+            name = args.search
+            toggle_saved_search(target, args.search, args.action, headers, verbose=False)
+            return [{"host": host, "status": "OK", "name": args.search, "detail": f"{args.action}d"}]
+        elif args.action == "create":
+            name = rule_data["name"]
+            create_saved_search_from_yaml(target, rule_data, headers, verbose=False)
+            return [{"host": host, "status": "OK", "name": rule_data["name"], "detail": "created"}]
+        elif args.action == "search":
+            results = fetch_search_results(target, args.query, headers, verbose=False)
+            return [{"host": host, "status": "RESULT", "name": "", "detail": json.dumps(row)} for row in results] \
+                or [{"host": host, "status": "EMPTY", "name": "", "detail": "No results found."}]
+    except Exception as e:
+        return [{"host": host, "status": "ERROR", "name": name, "detail": " ".join(str(e).split())[:200] or repr(e)}]
+
+def print_results_table(rows):
+    host_w = max([4] + [len(r["host"]) for r in rows])
+    status_w = max([6] + [len(r["status"]) for r in rows])
+    name_w = max([4] + [len(r["name"] or "") for r in rows])
+    header = f"{'HOST':<{host_w}}  {'STATUS':<{status_w}}  {'NAME':<{name_w}}  DETAIL"
+
+    print(f"\n{header}")
+    print("-" * max(len(header), 60))
+    for r in rows:
+        print(f"{r['host']:<{host_w}}  {r['status']:<{status_w}}  {r['name'] or '':<{name_w}}  {r['detail']}")
+    print("-" * max(len(header), 60))
+
+def run_fleet(targets, args, rule_data=None, max_hosts=DEFAULT_MAX_HOSTS, rule_names=None):
+    """
+    Fan an action out to every fleet host concurrently and print one merged
+    table. Each request has a timeout, so a dead host only delays its own rows.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    rows = []
+    with ThreadPoolExecutor(max_workers=min(len(targets), max_hosts)) as executor:
+        futures = {executor.submit(run_action_on_host, t, args, rule_data, rule_names): t for t in targets}
+        for future in as_completed(futures):
+            host_rows = future.result()
+            status = "failed" if host_rows[0]["status"] == "ERROR" and not host_rows[0]["name"] else "done"
+            print(f"[>] {futures[future]['name']}: {status}")
+            rows.extend(host_rows)
+
+    order = {t["name"]: i for i, t in enumerate(targets)}
+    rows.sort(key=lambda r: order[r["host"]])
+    print_results_table(rows)
+
+    if args.action in ["enable", "disable"] and has_bulk_selector(args):
+        print_toggle_summary(rows)
+
+    failed = {r["host"] for r in rows if r["status"] == "ERROR" and not r["name"]}
+    print(f"[+] Hosts OK: {len(targets) - len(failed)}")
+    if failed:
+        print(f"[!] Hosts failed: {len(failed)}")
+    return rows
+
 
 # ----- Main Entry Point ----- #
 def main():
@@ -164,21 +409,51 @@ def main():
     parser.add_argument("--config", default="config.json", help="Path to Splunk config JSON file")
     parser.add_argument("--action", choices=["list", "enable", "disable", "create", "search"], required=True)
     parser.add_argument("--search", help="Saved search name (for enable/disable)")
+    parser.add_argument("--pattern", action="append", help="Glob on saved search names (for enable/disable, repeatable)")
+    parser.add_argument("--regex", help="Regex on saved search names (for enable/disable)")
+    parser.add_argument("--tag", action="append", help="Select saved searches whose YAML rule has this tag (repeatable)")
+    parser.add_argument("--owner", help="Select saved searches whose YAML rule has this owner")
+    parser.add_argument("--rules-dir", default=DEFAULT_RULES_DIR, help="YAML rules directory used by --tag/--owner")
+    parser.add_argument("--dry-run", action="store_true", help="Preview which saved searches enable/disable would change")
     parser.add_argument("--rule", help="Path to YAML file for creating a saved search")
     parser.add_argument("--query", help="Raw SPL to execute (for action=search)")
+    parser.add_argument("--fleet", help="Path to fleet JSON file; runs the action on every listed host")
+    parser.add_argument("--max-hosts", type=int, default=DEFAULT_MAX_HOSTS, help="Hosts worked on concurrently in fleet mode")
 
     args = parser.parse_args()
 
     try:
+        if args.dry_run and args.action not in ["enable", "disable"]:
+            raise ValueError("--dry-run is only supported for enable/disable.")
+
+        rule_names = None
+        if args.action in ["enable", "disable"]:
+            if not (args.search or args.pattern or args.regex or args.tag or args.owner):
+                raise ValueError("You must provide --search, --pattern, --regex, --tag or --owner for enable/disable.")
+            if args.tag or args.owner:
+                rule_names = resolve_rule_names(args.rules_dir, args.tag, args.owner)
+
+        if args.fleet:
+            if args.action == "create" and not args.rule:
+                raise ValueError("You must provide --rule for creating a saved search.")
+            if args.action == "search" and not args.query:
+                raise ValueError("You must provide --query for search action.")
+            rule_data = load_rule_yaml(args.rule) if args.action == "create" else None
+            run_fleet(load_fleet_config(args.fleet), args, rule_data, args.max_hosts, rule_names)
+            return
+
         config = load_config(args.config)
         headers = build_auth_header(config)
 
         if args.action == "list":
             list_saved_searches(config, headers)
         elif args.action in ["enable", "disable"]:
-            if not args.search:
-                raise ValueError("You must provide --search for enable/disable.")
-            toggle_saved_search(config, args.search, args.action, headers)
+            if has_bulk_selector(args):
+                rows = run_bulk_toggle(config, args, headers, rule_names)
+                print_results_table(rows)
+                print_toggle_summary(rows)
+            else:
+                toggle_saved_search(config, args.search, args.action, headers)
         elif args.action == "create":
             if not args.rule:
                 raise ValueError("You must provide --rule for creating a saved search.")
@@ -1,20 +1,28 @@
-import requests
-from requests.auth import HTTPBasicAuth
-import urllib3
-from croniter import croniter
 from datetime import datetime, timedelta
 from collections import defaultdict
-import matplotlib.pyplot as plt
 import random
+import argparse
+import os
+import sys
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests"))
+
+from auth import get_session_key, load_requests
+from capacity_model import get_capacity
+from concurrency_plots import VIEWS, render_run_map
 
 SPLUNK_HOST = "https://localhost:8089"
 USERNAME = "admin"
 PASSWORD = "password"
-MAX_CONCURRENCY = 3  # <-- Set your concurrency threshold here
+
+def get_max_concurrency():
+    config = {"host": SPLUNK_HOST, "username": USERNAME, "password": PASSWORD}
+    capacity = get_capacity(config, get_session_key(config))
+    return capacity["effective_scheduled_searches"]
 
 def list_saved_searches_rest():
+    requests = load_requests()
+    from requests.auth import HTTPBasicAuth
     url = f"{SPLUNK_HOST}/servicesNS/-/-/saved/searches?output_mode=json&count=0"
 
     response = requests.get(
@@ -49,8 +57,9 @@ def list_saved_searches_rest():
         })
     return results
 
-def simulate_cron_times(cron_expr, hours=6):
-    now = datetime.now().replace(second=0, microsecond=0)
+def simulate_cron_times(cron_expr, hours=6, now=None):
+    from croniter import croniter
+    now = now or datetime.now().replace(second=0, microsecond=0)
     end = now + timedelta(hours=hours)
     times = []
 
@@ -65,31 +74,33 @@ def simulate_cron_times(cron_expr, hours=6):
         print(f"[!] Invalid cron '{cron_expr}': {e}")
     return times
 
-def build_concurrency_chart(schedule_data):
+def build_concurrency_chart(schedule_data, max_concurrency, hours=6, view="lines", save_path=None, csv_path=None,
+                            interactive=False, start=None):
     concurrency = defaultdict(int)
     for ts_list in schedule_data.values():
         for ts in ts_list:
             concurrency[ts] += 1
 
-    sorted_times = sorted(concurrency)
-    counts = [concurrency[ts] for ts in sorted_times]
-
-    time_labels = [ts.strftime("%H:%M") for ts in sorted_times]
-
-    plt.figure(figsize=(16, 6))
-    plt.plot(time_labels, counts, label='Concurrent Alerts', color='blue')
-    plt.axhline(MAX_CONCURRENCY, color='red', linestyle='--', label=f'Max Concurrency = {MAX_CONCURRENCY}')
-    plt.xticks(rotation=45, fontsize=8)
-    plt.ylabel("Concurrent Alert Executions")
-    plt.title("Splunk Alert Concurrency Simulation (Next 6 Hours)")
-    plt.legend()
-    plt.tight_layout()
-    plt.grid(True)
-    plt.show()
+    render_run_map(concurrency, max_concurrency, view=view, save_path=save_path, csv_path=csv_path,
+                   title=f"Splunk Alert Concurrency Simulation (Next {hours} Hours)", interactive=interactive,
+                   window=(start, start + timedelta(hours=hours)) if start else None)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate alert concurrency for scheduled saved searches.")
+    parser.add_argument("--hours", type=int, default=6, help="Simulation horizon in hours (e.g. 720 for 30 days)")
+    parser.add_argument("--view", choices=VIEWS, default="lines", help="Aggregated lines, day x minute heatmap, or text only")
+    parser.add_argument("--save", help="Path to write the chart image to (default: Pushes/)")
+    parser.add_argument("--csv", help="Path to write the per-minute run counts as CSV")
+    parser.add_argument("--interactive", action="store_true", help="Open the chart in an interactive window")
+    args = parser.parse_args()
+
+    if args.view != "text" and not args.save and not args.interactive:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        args.save = os.path.join("Pushes", f"alert_concurrency_{timestamp}.png")
+
     searches = list_saved_searches_rest()
     schedule_data = {}
+    start = datetime.now().replace(second=0, microsecond=0)
 
     for s in searches:
         if (
@@ -99,7 +110,8 @@ if __name__ == "__main__":
             and s['cron_schedule']
         ):
             print(f"Simulating for rule: {s['name']}, Fidelity: {s['fidelity']}, Criticality: {s['criticality']}")
-            runs = simulate_cron_times(s['cron_schedule'])
+            runs = simulate_cron_times(s['cron_schedule'], args.hours, start)
             schedule_data[s['name']] = runs
 
-    build_concurrency_chart(schedule_data)
+    build_concurrency_chart(schedule_data, get_max_concurrency(), args.hours, args.view, args.save, args.csv,
+                            args.interactive, start)
@@ -1,5 +1,10 @@
-import splunklib.client as client
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests"))
+
+from auth import get_session_key
+from capacity_model import get_capacity
 
 def get_admin_max_concurrent_saved_searches(
     host="localhost",
@@ -8,35 +13,18 @@ def get_admin_max_concurrent_saved_searches(
     password="password",
     scheme="https"
 ):
-    # Connect to Splunk
-    service = client.connect(
-        host=host,
-        port=port,
-        username=username,
-        password=password,
-        scheme=scheme
-    )
-
-    # Get general limits
-    search_settings = service.confs.get('limits', namespace='search')
-    cpu_count = os.cpu_count() or 4
-    max_searches_per_cpu = int(search_settings.get('max_searches_per_cpu', 1))
-    base_max_searches = int(search_settings.get('base_max_searches', 6))
-    max_scheduled_percentage = int(search_settings.get('max_searches_perc', 50))
-
-    max_system_searches = max(cpu_count * max_searches_per_cpu, base_max_searches)
-    max_scheduled_concurrent = int((max_system_searches * max_scheduled_percentage) / 100)
-
-    # Get admin role quota
-    for role in service.roles:
-        role.refresh()
-        if role.name == "admin":
-            sched_quota = int(role.content.get('scheduleSearchJobsQuota', 0))
-            effective_sched = min(max_scheduled_concurrent, sched_quota) if sched_quota else max_scheduled_concurrent
-            return effective_sched
+    config = {
+        "host": f"{scheme}://{host}:{port}",
+        "username": username,
+        "password": password,
+    }
+    headers = get_session_key(config)
 
-    # If admin role not found
-    return None
+    # Cores come from server/info, limits from limits.conf, quota from the admin role
+    capacity = get_capacity(config, headers, role="admin")
+    if not capacity["quotas"]:
+        return None
+    return capacity["effective_scheduled_searches"]
 
 # Example usage
 if __name__ == "__main__":
@@ -1,10 +1,17 @@
-import requests
-from urllib3.exceptions import InsecureRequestWarning
-requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+def load_requests():
+    """
+    Import requests on first use so entry points that never touch the network
+    start fast. Also silences the self-signed certificate warnings.
+    """
+    import requests
+    from urllib3.exceptions import InsecureRequestWarning
+    requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+    return requests
 
 def get_session_key(config):
     if config.get("token"):
         return {"Authorization": f"Bearer {config['token']}"}
+    requests = load_requests()
     login_url = f"{config['host']}/services/auth/login"
     response = requests.post(login_url, data={
         "username": config["username"],
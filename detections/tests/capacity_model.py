@@ -0,0 +1,141 @@
+import time
+from urllib.parse import quote
+from auth import load_requests
+
+# Defaults shipped in Splunk's limits.conf, used when a value can't be read
+LIMITS_DEFAULTS = {
+    "max_searches_per_cpu": 1,
+    "base_max_searches": 6,
+    "max_searches_perc": 50,
+    "auto_summary_perc": 50,
+}
+
+DEFAULT_CORES = 4
+DEFAULT_TTL = 300  # seconds
+
+# (host, role) -> (expires_at, capacity)
+_CACHE = {}
+
+
+def _get_json(url, headers):
+    requests = load_requests()
+    response = requests.get(url, headers=headers, verify=False, params={"output_mode": "json"})
+    if response.status_code != 200:
+        raise Exception(f"Request to {url} failed ({response.status_code}):\n{response.text}")
+    return response.json()
+
+
+def get_server_cores(config, headers):
+    """
+    Number of CPU cores on the search head, from /services/server/info.
+    Splunk sizes its search limits on virtual cores when they are reported.
+    """
+    payload = _get_json(f"{config['host']}/services/server/info", headers)
+    content = payload.get("entry", [{}])[0].get("content", {})
+    cores = content.get("numberOfVirtualCores") or content.get("numberOfCores")
+    if not cores:
+        raise Exception("server/info did not report a core count.")
+    return int(cores)
+
+
+def get_search_limits(config, headers):
+    """
+    Concurrency settings from the [search] and [scheduler] stanzas of limits.conf.
+    Missing values, or a stanza that can't be read, fall back to Splunk's
+    shipped defaults without discarding what the other stanza returned.
+    """
+    limits = dict(LIMITS_DEFAULTS)
+    for stanza in ("search", "scheduler"):
+        url = f"{config['host']}/servicesNS/nobody/search/configs/conf-limits/{stanza}"
+        try:
+            entries = _get_json(url, headers).get("entry", [])
+        except Exception as e:
+            print(f"[!] Could not read limits.conf [{stanza}] ({e}). Using Splunk defaults for it.")
+            continue
+        for entry in entries:
+            content = entry.get("content", {})
+            for key in LIMITS_DEFAULTS:
+                if key in content and content[key] not in (None, ""):
+                    limits[key] = int(float(content[key]))
+    return limits
+
+
+def get_role_quotas(config, headers, role="admin"):
+    """
+    Search job quotas for a role. A quota of 0 means unlimited.
+    """
+    encoded_role = quote(role, safe="")
+    payload = _get_json(f"{config['host']}/services/authorization/roles/{encoded_role}", headers)
+    content = payload.get("entry", [{}])[0].get("content", {})
+    return {
+        "srchJobsQuota": int(content.get("srchJobsQuota", 0) or 0),
+        "scheduleSearchJobsQuota": int(content.get("scheduleSearchJobsQuota", 0) or 0),
+    }
+
+
+def compute_capacity(cores, limits, quotas=None):
+    """
+    Apply Splunk's concurrency formulas:
+      max_hist_searches  = max_searches_per_cpu * cores + base_max_searches
+      max_sched_searches = max_hist_searches * max_searches_perc / 100
+    then cap the scheduler share by the role's scheduled search quota and
+    the ad-hoc (historical) limit by the role's srchJobsQuota.
+    """
+    quotas = quotas or {}
+    max_hist = limits["max_searches_per_cpu"] * cores + limits["base_max_searches"]
+    max_sched = int(max_hist * limits["max_searches_perc"] / 100)
+    max_auto_summary = int(max_sched * limits["auto_summary_perc"] / 100)
+
+    effective_sched = max_sched
+    sched_quota = quotas.get("scheduleSearchJobsQuota", 0)
+    if sched_quota:
+        effective_sched = min(effective_sched, sched_quota)
+
+    effective_adhoc = max_hist
+    adhoc_quota = quotas.get("srchJobsQuota", 0)
+    if adhoc_quota:
+        effective_adhoc = min(effective_adhoc, adhoc_quota)
+
+    return {
+        "cores": cores,
+        "limits": limits,
+        "quotas": quotas,
+        "max_historical_searches": max_hist,
+        "max_scheduled_searches": max_sched,
+        "max_auto_summary_searches": max_auto_summary,
+        "effective_scheduled_searches": max(effective_sched, 1),
+        "effective_adhoc_searches": max(effective_adhoc, 1),
+    }
+
+
+def get_capacity(config, headers, role="admin", ttl=DEFAULT_TTL, refresh=False):
+    """
+    Server-accurate capacity model for a Splunk instance, cached per host and role
+    for `ttl` seconds. Values that can't be fetched fall back to defaults.
+    """
+    key = (config["host"], role)
+    cached = _CACHE.get(key)
+    if cached and not refresh and cached[0] > time.monotonic():
+        return cached[1]
+
+    try:
+        cores = get_server_cores(config, headers)
+    except Exception as e:
+        print(f"[!] Could not read server/info ({e}). Assuming {DEFAULT_CORES} cores.")
+        cores = DEFAULT_CORES
+
+    limits = get_search_limits(config, headers)
+
+    try:
+        quotas = get_role_quotas(config, headers, role)
+    except Exception as e:
+        print(f"[!] Could not read quotas for role '{role}' ({e}). Ignoring role quotas.")
+        quotas = {}
+
+    capacity = compute_capacity(cores, limits, quotas)
+    _CACHE[key] = (time.monotonic() + ttl, capacity)
+    return capacity
+
+
+def clear_cache():
+    _CACHE.clear()
@@ -0,0 +1,221 @@
+import os
+import csv
+import math
+from datetime import timedelta
+
+VIEWS = ["lines", "heatmap", "text"]
+
+# Bucket sizes (minutes) the aggregated view picks from
+BUCKET_SIZES = [1, 5, 15, 30, 60, 240, 1440]
+MAX_POINTS = 720
+
+
+def _pyplot(interactive=False):
+    """
+    Import pyplot on first use. A non-interactive backend is selected unless
+    `interactive` is set, so plotting never blocks on a headless runner.
+    """
+    import matplotlib
+    if not interactive:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _span(run_map, window=None):
+    """
+    (start, end) minutes covered by a run_map: the simulated `window` when
+    given, otherwise the first and last minute with runs.
+    """
+    if window:
+        start, end = window
+    else:
+        times = sorted(run_map)
+        start, end = times[0], times[-1]
+    return start.replace(second=0, microsecond=0), end.replace(second=0, microsecond=0)
+
+
+def _bucket_start(minute, bucket_minutes):
+    offset = (minute.hour * 60 + minute.minute) % bucket_minutes
+    return minute.replace(second=0, microsecond=0) - timedelta(minutes=offset)
+
+
+def pick_bucket_minutes(run_map, max_points=MAX_POINTS, window=None):
+    start, end = _span(run_map, window)
+    horizon = (end - start).total_seconds() / 60 + 1
+    for size in BUCKET_SIZES:
+        if horizon / size <= max_points:
+            return size
+    return BUCKET_SIZES[-1]
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile on an already sorted list
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def aggregate_run_map(run_map, bucket_minutes, window=None):
+    """
+    Collapse a per-minute run_map into buckets of `bucket_minutes`.
+    Minutes with no runs count as 0, and every bucket from the start of
+    `window` (or the first run) to its end is emitted so idle periods show
+    as zeros. Returns (bucket_start, p50, p95, max) tuples.
+    """
+    if not run_map:
+        return []
+
+    buckets = {}
+    for ts, count in run_map.items():
+        buckets.setdefault(_bucket_start(ts, bucket_minutes), []).append(count)
+
+    start, end = _span(run_map, window)
+    rows = []
+    bucket = _bucket_start(start, bucket_minutes)
+    while bucket <= end:
+        minutes = buckets.get(bucket, [])
+        counts = sorted(minutes + [0] * (bucket_minutes - len(minutes)))
+        rows.append((bucket, percentile(counts, 50), percentile(counts, 95), counts[-1]))
+        bucket += timedelta(minutes=bucket_minutes)
+    return rows
+
+
+def heatmap_matrix(run_map):
+    """
+    Day-by-minute matrix of concurrent run counts: one row per day, 1440 columns.
+    """
+    start, end = _span(run_map)
+    start = start.replace(hour=0, minute=0)
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    matrix = [[0] * 1440 for _ in days]
+    for ts, count in run_map.items():
+        row = (ts.replace(hour=0, minute=0, second=0, microsecond=0) - start).days
+        matrix[row][ts.hour * 60 + ts.minute] += count
+    return days, matrix
+
+
+def _finish(plt, save_path, interactive):
+    if save_path:
+        directory = os.path.dirname(save_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        plt.savefig(save_path)
+        print(f"[+] Chart saved to {save_path}")
+    elif interactive:
+        plt.show()
+    else:
+        print("[!] No save path given for non-interactive backend; chart not written.")
+    plt.close()
+
+
+def plot_aggregated(run_map, hard_limit, soft_limit=None, bucket_minutes=None,
+                    title="Concurrent Scheduled Searches", save_path=None, interactive=False, window=None):
+    """
+    p50/p95/max concurrency per time bucket. The bucket size grows with the
+    horizon so the number of plotted points stays bounded.
+    """
+    bucket_minutes = bucket_minutes or pick_bucket_minutes(run_map, window=window)
+    rows = aggregate_run_map(run_map, bucket_minutes, window)
+    times = [r[0] for r in rows]
+
+    plt = _pyplot(interactive)
+    plt.figure(figsize=(14, 6))
+    plt.plot(times, [r[3] for r in rows], color='blue', linewidth=1, label='Max')
+    plt.plot(times, [r[2] for r in rows], color='purple', linewidth=1, label='p95')
+    plt.plot(times, [r[1] for r in rows], color='gray', linewidth=1, label='p50')
+    plt.fill_between(times, [r[3] for r in rows], alpha=0.15, color='blue')
+
+    plt.axhline(y=hard_limit, color='red', linestyle='--', linewidth=2, label=f'Hard Limit ({hard_limit})')
+    if soft_limit:
+        plt.axhline(y=soft_limit, color='orange', linestyle='--', linewidth=2, label=f'Soft Limit ({soft_limit})')
+
+    plt.title(f"{title} ({bucket_minutes}-minute buckets)")
+    plt.xlabel("Time")
+    plt.ylabel("Concurrent Search Count")
+    plt.gcf().autofmt_xdate()
+    plt.grid(True)
+    plt.legend()
+    plt.tight_layout()
+    _finish(plt, save_path, interactive)
+
+
+def plot_heatmap(run_map, hard_limit, title="Concurrent Scheduled Searches",
+                 save_path=None, interactive=False):
+    """
+    Day-by-minute heatmap; cells at or above the hard limit saturate the colour scale.
+    """
+    days, matrix = heatmap_matrix(run_map)
+
+    plt = _pyplot(interactive)
+    plt.figure(figsize=(16, max(3, min(len(days) * 0.3, 12))))
+    image = plt.imshow(matrix, aspect='auto', interpolation='nearest', cmap='inferno',
+                       vmin=0, vmax=max(hard_limit, 1))
+    plt.colorbar(image, label=f"Concurrent searches (clipped at hard limit {hard_limit})")
+
+    plt.xticks(range(0, 1440, 120), [f"{h:02d}:00" for h in range(0, 24, 2)])
+    step = max(len(days) // 15, 1)
+    plt.yticks(range(0, len(days), step), [d.strftime("%Y-%m-%d") for d in days[::step]])
+
+    plt.title(f"{title} (day x minute)")
+    plt.xlabel("Time of day")
+    plt.tight_layout()
+    _finish(plt, save_path, interactive)
+
+
+def write_run_map_csv(run_map, csv_path):
+    directory = os.path.dirname(csv_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["minute", "concurrent"])
+        for ts in sorted(run_map):
+            writer.writerow([ts.strftime("%Y-%m-%d %H:%M"), run_map[ts]])
+    print(f"[+] Run map written to {csv_path}")
+
+
+def print_run_map_summary(run_map, hard_limit, soft_limit=None, top=10):
+    """
+    Text-only summary of a run_map: peak, minutes over each limit and the busiest minutes.
+    """
+    if not run_map:
+        print("[!] No scheduled runs in the simulated window.")
+        return
+
+    counts = sorted(run_map.values())
+    over_hard = sum(1 for c in counts if c > hard_limit)
+    over_soft = sum(1 for c in counts if soft_limit and c > soft_limit)
+
+    print(f"[i] Minutes with runs: {len(counts)}")
+    print(f"[i] Concurrency p50/p95/max: {percentile(counts, 50)}/{percentile(counts, 95)}/{counts[-1]}")
+    print(f"[i] Minutes over hard limit ({hard_limit}): {over_hard}")
+    if soft_limit:
+        print(f"[i] Minutes over soft limit ({soft_limit}): {over_soft}")
+
+    print(f"[i] Busiest {min(top, len(run_map))} minutes:")
+    for ts, count in sorted(run_map.items(), key=lambda item: (-item[1], item[0]))[:top]:
+        print(f"  - {ts.strftime('%Y-%m-%d %H:%M')}: {count}")
+
+
+def render_run_map(run_map, hard_limit, soft_limit=None, view="lines", save_path=None,
+                   csv_path=None, title="Concurrent Scheduled Searches", interactive=False, window=None):
+    """
+    Render a run_map as an aggregated line chart, a heatmap or text only.
+    `window` is the simulated (start, end); the line chart covers exactly
+    that range. The text view (and CSV export) never imports matplotlib.
+    """
+    if view not in VIEWS:
+        raise ValueError(f"Unknown view '{view}', expected one of {VIEWS}")
+    if csv_path:
+        write_run_map_csv(run_map, csv_path)
+    if view == "text":
+        print_run_map_summary(run_map, hard_limit, soft_limit)
+        return
+    if not run_map:
+        print("[!] No scheduled runs in the simulated window; nothing to plot.")
+        return
+    if view == "heatmap":
+        plot_heatmap(run_map, hard_limit, title=title, save_path=save_path, interactive=interactive)
+    else:
+        plot_aggregated(run_map, hard_limit, soft_limit, title=title, save_path=save_path,
+                        interactive=interactive, window=window)
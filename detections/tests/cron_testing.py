@@ -1,13 +1,10 @@
-import requests
-import urllib3
 import json
 import os
 from datetime import datetime, timedelta
-from croniter import croniter
-import matplotlib.pyplot as plt
 from collections import defaultdict
-
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from auth import load_requests
+from capacity_model import get_capacity
+from concurrency_plots import render_run_map
 
 def load_config(config_path):
     if not os.path.exists(config_path):
@@ -16,6 +13,7 @@ def load_config(config_path):
         return json.load(f)
 
 def get_session_key(base_url, username, password):
+    requests = load_requests()
     login_url = f"{base_url}/services/auth/login"
     data = {"username": username, "password": password}
     response = requests.post(login_url, data=data, verify=False)
@@ -32,6 +30,7 @@ def build_auth_header(config):
         raise ValueError("No valid authentication method found in config.")
 
 def get_scheduled_searches(config, headers):
+    requests = load_requests()
     url = f"{config['host']}/servicesNS/admin/{config['app']}/saved/searches?output_mode=json&count=0"
     response = requests.get(url, headers=headers, verify=False)
     if response.status_code != 200:
@@ -51,11 +50,12 @@ def get_scheduled_searches(config, headers):
         })
     return searches
 
-def simulate_cron_runs(searches):
-    now = datetime.now()
-    end_time = now + timedelta(hours=24)
+def simulate_cron_runs(searches, hours=24, start=None):
+    now = start or datetime.now()
+    end_time = now + timedelta(hours=hours)
     run_map = defaultdict(int)
 
+    from croniter import croniter
     for s in searches:
         if not s["cron"] or s["disabled"]:
             continue
@@ -73,70 +73,31 @@ def simulate_cron_runs(searches):
     return run_map
 
 def get_max_concurrent_limit(config, headers):
-    url = f"{config['host']}/servicesNS/nobody/search/configs/conf-limits/search?output_mode=json"
-    response = requests.get(url, headers=headers, verify=False)
-
-    if response.status_code != 200:
-        print("[!] Could not retrieve limits.conf. Using default max concurrency of 5.")
-        return 5
-
-    entries = response.json().get("entry", [])
-    for entry in entries:
-        content = entry.get("content", {})
-        if "max_searches_per_cpu" in content:
-            max_per_cpu = int(content["max_searches_per_cpu"])
-            num_cpus = 4  # You could fetch this from server/info dynamically
-            return max_per_cpu * num_cpus
-
-    print("[!] max_searches_per_cpu not found in limits.conf. Using default of 5.")
-    return 5
-
-def plot_run_map(run_map, hard_limit=5, soft_limit=None, save_path=None):
-    times = sorted(run_map.keys())
-    counts = [run_map[t] for t in times]
-
-    plt.figure(figsize=(14, 6))
-    plt.plot(times, counts, marker='o', linestyle='-', color='blue', label='Scheduled Search Count')
-    plt.fill_between(times, counts, alpha=0.2, color='blue')
-
-    plt.axhline(y=hard_limit, color='red', linestyle='--', linewidth=2, label=f'Hard Limit ({hard_limit})')
-    if soft_limit:
-        plt.axhline(y=soft_limit, color='orange', linestyle='--', linewidth=2, label=f'Soft Limit ({soft_limit})')
-
-    over_hard = [t for t in times if run_map[t] > hard_limit]
-    if over_hard:
-        plt.scatter(over_hard, [run_map[t] for t in over_hard], color='red', label='Over Hard Limit', zorder=5)
-
-    over_soft = [t for t in times if run_map[t] > soft_limit]
-    if over_soft:
-        plt.scatter(over_soft, [run_map[t] for t in over_soft], color='orange', label='Over Soft Limit', zorder=5)
-
-    plt.title("Concurrent Scheduled Searches Over Next 24 Hours")
-    plt.xlabel("Time")
-    plt.ylabel("Concurrent Search Count")
-    plt.xticks(rotation=45)
-    plt.grid(True)
-    plt.legend()
-    plt.tight_layout()
-
-    if save_path:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        plt.savefig(save_path)
-        print(f"[+] Chart saved to {save_path}")
-    else:
-        plt.show()
-
-    plt.close()
-
-def analyze_scheduled_searches(config_path: str):
+    """
+    Effective number of scheduled searches the instance can run at once,
+    from the shared capacity model (server cores, limits.conf and role quotas).
+    """
+    capacity = get_capacity(config, headers)
+    return capacity["effective_scheduled_searches"]
+
+def plot_run_map(run_map, hard_limit=5, soft_limit=None, save_path=None, view="lines", csv_path=None,
+                 interactive=False, window=None):
+    render_run_map(run_map, hard_limit, soft_limit, view=view, save_path=save_path, csv_path=csv_path,
+                   title="Concurrent Scheduled Searches", interactive=interactive, window=window)
+
+def analyze_scheduled_searches(config_path: str, hours: int = 24, view: str = "lines", csv_path: str = None,
+                               interactive: bool = False):
     config = load_config(config_path)
     headers = build_auth_header(config)
     searches = get_scheduled_searches(config, headers)
-    run_map = simulate_cron_runs(searches)
+    start = datetime.now()
+    run_map = simulate_cron_runs(searches, hours, start=start)
     hard_limit = get_max_concurrent_limit(config, headers)
     soft_limit = int(hard_limit * 0.8)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     save_path = os.path.join("Pushes", f"scheduled_search_load_{timestamp}.png")
 
-    plot_run_map(run_map, hard_limit=hard_limit, soft_limit=soft_limit, save_path=save_path)
+    plot_run_map(run_map, hard_limit=hard_limit, soft_limit=soft_limit,
+                 save_path=None if view == "text" or interactive else save_path, view=view, csv_path=csv_path,
+                 interactive=interactive, window=(start, start + timedelta(hours=hours)))
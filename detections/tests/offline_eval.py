@@ -0,0 +1,307 @@
+import os
+import re
+import json
+import argparse
+from array import array
+
+# Fields set by the indexer, not present in raw sample events. Constraints on
+# them are ignored offline unless the samples actually carry the field.
+METADATA_FIELDS = {"index", "sourcetype", "source", "host"}
+
+# Time range modifiers select the search window, not events; always ignored offline
+TIME_MODIFIERS = {"earliest", "latest", "_index_earliest", "_index_latest", "starttime", "endtime", "timeformat"}
+
+# Search keywords the parser does not implement. Treating them as free text
+# would silently report 0 matches, so they are rejected instead.
+UNSUPPORTED_KEYWORDS = {"IN", "TERM", "CASE"}
+
+# Commands after the base search that don't change the matched event count
+PASSTHROUGH_COMMANDS = {"table", "fields", "sort", "rename"}
+
+_TOKEN_RE = re.compile(r'\(|\)|(?:[^\s()"]|"(?:[^"\\]|\\.)*")+')
+_TERM_RE = re.compile(r'^([A-Za-z_][\w.:-]*)(!=|=)(.*)$')
+
+
+# ----- Columnar Sample Store ----- #
+def load_ndjson_columns(sample_path):
+    """
+    Load NDJSON events into dictionary-encoded columns. Each field keeps its
+    distinct values once plus one integer code per event (0 = field missing),
+    so a predicate only has to be evaluated per distinct value.
+    """
+    columns = {}
+    count = 0
+
+    with open(sample_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                print(f"[!] Skipping malformed sample line {count + 1}")
+                continue
+
+            for field, value in event.items():
+                column = columns.get(field)
+                if column is None:
+                    column = {"values": [None], "index": {}, "codes": array("I")}
+                    columns[field] = column
+                codes = column["codes"]
+                if len(codes) < count:
+                    # Field missing from the events since it was last seen
+                    codes.extend(array("I", bytes(4 * (count - len(codes)))))
+                value = str(value)
+                code = column["index"].get(value)
+                if code is None:
+                    code = len(column["values"])
+                    column["index"][value] = code
+                    column["values"].append(value)
+                codes.append(code)
+            count += 1
+
+    for column in columns.values():
+        if len(column["codes"]) < count:
+            column["codes"].extend(array("I", bytes(4 * (count - len(column["codes"])))))
+
+    return {"count": count, "columns": columns}
+
+
+# Masks are ints with one byte per event (0x01 = match), built from bytes so
+# AND/OR/NOT and counting across all events run as single C-level operations.
+def _mask_from_flags(flags):
+    return int.from_bytes(bytes(flags), "little")
+
+
+def _full_mask(table):
+    return int.from_bytes(b"\x01" * table["count"], "little")
+
+
+# ----- SPL Subset Parser ----- #
+def _wildcard_regex(value):
+    return re.compile("^" + ".*".join(re.escape(part) for part in value.split("*")) + "$", re.IGNORECASE)
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        # Inside quotes SPL uses backslash escapes (\" and \\)
+        return re.sub(r'\\(["\\])', r'\1', value[1:-1])
+    return value
+
+
+def _split_pipeline(spl):
+    segments, current, quoted = [], [], False
+    for ch in spl:
+        if ch == '"':
+            quoted = not quoted
+        if ch == "|" and not quoted:
+            segments.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    segments.append("".join(current).strip())
+    return segments
+
+
+def _parse_terms(tokens):
+    """
+    Recursive descent over search tokens. As in Splunk, OR binds tighter than
+    the (implicit) AND, and NOT binds tightest.
+    """
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def parse_and():
+        nonlocal pos
+        nodes = [parse_or()]
+        while peek() not in (None, ")"):
+            if peek() == "AND":
+                pos += 1
+            nodes.append(parse_or())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def parse_or():
+        nonlocal pos
+        nodes = [parse_not()]
+        while peek() == "OR":
+            pos += 1
+            nodes.append(parse_not())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_not():
+        nonlocal pos
+        if peek() == "NOT":
+            pos += 1
+            return ("not", parse_not())
+        return parse_atom()
+
+    def parse_atom():
+        nonlocal pos
+        token = peek()
+        if token is None:
+            raise ValueError("Unexpected end of search")
+        pos += 1
+        if token == "(":
+            node = parse_and()
+            if peek() != ")":
+                raise ValueError("Unbalanced parentheses")
+            pos += 1
+            return node
+        if token in (")", "AND", "OR"):
+            raise ValueError(f"Unexpected '{token}'")
+        if token in UNSUPPORTED_KEYWORDS:
+            raise ValueError(f"Keyword not supported offline: {token}")
+        if token[0] in "`[":
+            raise ValueError(f"Macros and subsearches not supported offline: {token[:40]}")
+        match = _TERM_RE.match(token)
+        if match:
+            field, op, value = match.groups()
+            return ("term", field, op, _unquote(value))
+        if any(op in token for op in ("<", ">")):
+            raise ValueError(f"Unsupported comparison: {token}")
+        return ("text", _unquote(token))
+
+    if not tokens:
+        return ("all",)
+    node = parse_and()
+    if pos != len(tokens):
+        raise ValueError(f"Unexpected '{tokens[pos]}'")
+    return node
+
+
+def parse_spl(spl):
+    """
+    Parse the supported SPL subset into an expression tree:
+    field=value / field!=value with * wildcards, free text, AND/OR/NOT,
+    parentheses, and trailing | search, | table, | fields, | stats count.
+    """
+    segments = _split_pipeline(spl.strip())
+    base = segments[0]
+    if not base and len(segments) > 1:
+        raise ValueError(f"Generating command not supported offline: |{segments[1].split()[0]}")
+    if base.lower().startswith("search "):
+        base = base[len("search "):]
+
+    nodes = [_parse_terms(_TOKEN_RE.findall(base))]
+    for segment in segments[1:]:
+        command = segment.split()[0].lower() if segment else ""
+        if command == "search":
+            nodes.append(_parse_terms(_TOKEN_RE.findall(segment[len("search"):])))
+        elif re.fullmatch(r"stats\s+count", segment, re.IGNORECASE):
+            # Only a bare count: "stats count by X" returns one row per group
+            continue
+        elif command in PASSTHROUGH_COMMANDS:
+            continue
+        else:
+            raise ValueError(f"Command not supported offline: | {segment[:40]}")
+    return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+
+# ----- Evaluation ----- #
+def _eval_term(table, field, op, value):
+    if field.lower() in TIME_MODIFIERS:
+        return _full_mask(table)
+    column = table["columns"].get(field)
+    if column is None:
+        if field in METADATA_FIELDS:
+            return _full_mask(table)
+        return 0
+
+    pattern = _wildcard_regex(value)
+    lut = [0] + [1 if pattern.match(v) else 0 for v in column["values"][1:]]
+    if op == "!=":
+        lut = [0] + [1 - hit for hit in lut[1:]]
+    return _mask_from_flags(map(lut.__getitem__, column["codes"]))
+
+
+def _eval_text(table, value):
+    """
+    Free-text term: matches the event's _raw field when samples carry one,
+    otherwise any decoded field value (never field names or JSON escaping).
+    """
+    pattern = re.compile(".*".join(re.escape(part) for part in value.split("*")), re.IGNORECASE)
+    columns = table["columns"]
+    searched = [columns["_raw"]] if "_raw" in columns else columns.values()
+
+    mask = 0
+    for column in searched:
+        lut = [0] + [1 if pattern.search(v) else 0 for v in column["values"][1:]]
+        if any(lut):
+            mask |= _mask_from_flags(map(lut.__getitem__, column["codes"]))
+    return mask
+
+
+def evaluate(node, table, cache=None):
+    """
+    Evaluate an expression tree to an event mask. Leaf masks are cached by
+    term, so rules sharing a predicate scan the column only once.
+    """
+    cache = {} if cache is None else cache
+    kind = node[0]
+    if kind == "all":
+        return _full_mask(table)
+    if kind in ("term", "text"):
+        key = (node[0],) + tuple(node[1:-1]) + (node[-1].lower(),)
+        if key not in cache:
+            cache[key] = _eval_term(table, *node[1:]) if kind == "term" else _eval_text(table, node[1])
+        return cache[key]
+    if kind == "not":
+        return _full_mask(table) ^ evaluate(node[1], table, cache)
+
+    masks = [evaluate(child, table, cache) for child in node[1]]
+    result = masks[0]
+    for mask in masks[1:]:
+        result = result & mask if kind == "and" else result | mask
+    return result
+
+
+def evaluate_rules(rules, table, cache=None):
+    """
+    Count sample matches for each (path, rule) pair in one pass over the
+    columnar table. Rules outside the supported SPL subset are reported as such.
+    Pass the same `cache` across calls to reuse term masks between batches.
+    """
+    cache = {} if cache is None else cache
+    results = []
+    for path, rule in rules:
+        result = {"path": path, "name": rule.get("name", os.path.basename(path)), "matches": None, "error": None}
+        try:
+            result["matches"] = evaluate(parse_spl(rule.get("search", "")), table, cache).bit_count()
+        except ValueError as e:
+            result["error"] = str(e)
+        results.append(result)
+    return results
+
+
+def print_offline_results(results, total):
+    print(f"\n{'RULE':<45} {'MATCHES':>8}")
+    print("-" * 60)
+    for r in results:
+        matches = r["matches"] if r["error"] is None else "n/a"
+        print(f"{r['name'][:45]:<45} {matches:>8}")
+        if r["error"]:
+            print(f"  - {r['error']}")
+    print("-" * 60)
+    print(f"[+] Sample events: {total}")
+
+
+def main():
+    from rule_repository import load_rule_repository
+
+    parser = argparse.ArgumentParser(description="Count rule matches against local NDJSON samples.")
+    parser.add_argument("--samples", default="sample_logs.json", help="NDJSON sample events")
+    parser.add_argument("--rules", default=os.path.join("detections", "rules"), help="Rules directory")
+    args = parser.parse_args()
+
+    repository = load_rule_repository(args.rules, schema_path=None)
+    rules = [(path, rule) for path, rule in repository["rules"].items() if isinstance(rule, dict)]
+
+    table = load_ndjson_columns(args.samples)
+    print_offline_results(evaluate_rules(rules, table), table["count"])
+
+
+if __name__ == "__main__":
+    main()
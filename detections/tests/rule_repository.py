@@ -0,0 +1,299 @@
+import os
+import json
+import glob
+import hashlib
+
+BASE_DIR = os.getcwd()
+RULES_DIR = os.path.join(BASE_DIR, "detections", "rules")
+SCHEMA_PATH = os.path.join(BASE_DIR, "detections", "tests", "rule_schema.yaml")
+CACHE_PATH = os.path.join(BASE_DIR, "detections", ".rule_cache.json")
+
+CACHE_VERSION = 2
+CACHE_ENTRY_KEYS = ("mtime_ns", "size", "sha256", "rule", "error")
+PARALLEL_THRESHOLD = 64  # below this many changed files a process pool costs more than it saves
+
+INDEX_FIELDS = {
+    "by_name": "name",
+    "by_tag": "tags",
+    "by_technique": "mitre_attack",
+    "by_owner": "owner",
+    "by_cron": "cron",
+}
+
+
+# ----- Parsing ----- #
+def _yaml_loader():
+    """
+    Import yaml on first use and pick the libyaml C loader when available.
+    """
+    import yaml
+    try:
+        return yaml, yaml.CSafeLoader
+    except AttributeError:  # libyaml not available, fall back to the pure-Python loader
+        return yaml, yaml.SafeLoader
+
+
+def _parse_rule_file(path):
+    """
+    Read, hash and parse one rule file. Runs in worker processes, so it only
+    returns plain data: (path, mtime_ns, size, sha256, rule, error).
+    """
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+    yaml, loader = _yaml_loader()
+    try:
+        return path, stat.st_mtime_ns, stat.st_size, digest, yaml.load(content, Loader=loader), None
+    except yaml.YAMLError as e:
+        return path, stat.st_mtime_ns, stat.st_size, digest, None, f"Invalid YAML: {e}"
+
+
+def load_rule_file(path, cache_path=CACHE_PATH):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Rule YAML file not found: {path}")
+    path = os.path.abspath(path)
+    entry = parse_rule_files([path], cache_path)[path]
+    if entry["error"]:
+        raise ValueError(f"{path}: {entry['error']}")
+    return entry["rule"]
+
+
+def _load_cache(cache_path):
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        return {}
+    entries = cache.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def _serializable_entries(entries):
+    """
+    Entries that survive a JSON round trip unchanged. A rule holding a YAML
+    type JSON can't store (e.g. a date) is left out and re-parsed next run,
+    instead of failing the whole cache write.
+    """
+    kept = {}
+    for path, entry in entries.items():
+        try:
+            if json.loads(json.dumps(entry)) == entry:
+                kept[path] = entry
+        except (TypeError, ValueError):
+            continue
+    return kept
+
+
+def _save_cache(cache_path, entries):
+    if not cache_path or not os.path.isdir(os.path.dirname(cache_path) or "."):
+        return
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "entries": _serializable_entries(entries)}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"[!] Could not write rule cache {cache_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _is_fresh(entry, path):
+    """
+    A cached entry is reused when mtime and size are unchanged, or when the
+    file was touched but its content hash still matches. Malformed entries
+    count as a miss.
+    """
+    if not isinstance(entry, dict) or not all(key in entry for key in CACHE_ENTRY_KEYS):
+        return False
+    stat = os.stat(path)
+    if entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+        return True
+    with open(path, "rb") as f:
+        if hashlib.sha256(f.read()).hexdigest() != entry["sha256"]:
+            return False
+    entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+    return True
+
+
+def parse_rule_files(paths, cache_path=CACHE_PATH, workers=None):
+    """
+    Parse rule files with the C YAML loader, reusing the on-disk cache for
+    unchanged files and a process pool when many files changed.
+    Returns {path: cache entry}.
+    """
+    cached = _load_cache(cache_path)
+    entries, misses = {}, []
+    for path in paths:
+        entry = cached.get(path)
+        if entry and _is_fresh(entry, path):
+            entries[path] = entry
+        else:
+            misses.append(path)
+
+    if len(misses) >= PARALLEL_THRESHOLD and (workers or os.cpu_count() or 1) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = list(executor.map(_parse_rule_file, misses, chunksize=16))
+    else:
+        parsed = [_parse_rule_file(path) for path in misses]
+
+    for path, mtime_ns, size, digest, rule, error in parsed:
+        entries[path] = {"mtime_ns": mtime_ns, "size": size, "sha256": digest, "rule": rule, "error": error}
+
+    if misses:
+        # Keep entries for files outside this call, dropping deleted files
+        merged = {path: entry for path, entry in cached.items() if os.path.exists(path)}
+        merged.update(entries)
+        _save_cache(cache_path, merged)
+    return entries
+
+
+# ----- Schema ----- #
+_TYPE_CHECKS = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int),  # as in Cerberus, bool counts as an integer
+    "boolean": lambda v: isinstance(v, bool),
+    "list": lambda v: isinstance(v, list),
+    "dict": lambda v: isinstance(v, dict),
+}
+_SUPPORTED_RULES = {"type", "required", "nullable", "allowed", "min", "max", "schema"}
+
+
+def _compile_field(definition):
+    """
+    Turn one Cerberus field definition into a function returning a list of
+    error messages (Cerberus wording and null/bool handling). Returns None
+    for unsupported rules.
+    """
+    if set(definition) - _SUPPORTED_RULES or definition.get("type", "string") not in _TYPE_CHECKS:
+        return None
+
+    type_name = definition.get("type")
+    type_check = _TYPE_CHECKS.get(type_name)
+    nullable = definition.get("nullable", False)
+    allowed = list(definition["allowed"]) if "allowed" in definition else None
+    minimum, maximum = definition.get("min"), definition.get("max")
+    item_check = _compile_field(definition["schema"]) if "schema" in definition else None
+    if "schema" in definition and item_check is None:
+        return None
+
+    def check(value):
+        # Cerberus checks null before anything else and stops there
+        if value is None:
+            return [] if nullable else ["null value not allowed"]
+        if type_check and not type_check(value):
+            return [f"must be of {type_name} type"]
+        errors = []
+        if allowed is not None:
+            if isinstance(value, list):
+                unallowed = tuple(item for item in value if item not in allowed)
+                if unallowed:
+                    errors.append(f"unallowed values {unallowed}")
+            elif value not in allowed:
+                errors.append(f"unallowed value {value}")
+        try:
+            if minimum is not None and value < minimum:
+                errors.append(f"min value is {minimum}")
+            if maximum is not None and value > maximum:
+                errors.append(f"max value is {maximum}")
+        except TypeError:  # not comparable; Cerberus skips the check too
+            pass
+        if item_check and isinstance(value, list):
+            item_errors = {i: e for i, e in ((i, item_check(item)) for i, item in enumerate(value)) if e}
+            if item_errors:
+                errors.append(item_errors)
+        return errors
+
+    return check
+
+
+def compile_schema(schema_path=SCHEMA_PATH):
+    """
+    Precompile rule_schema.yaml into a validator function returning
+    {field: [errors]} like Cerberus' Validator.errors. Schemas using rules
+    outside the supported set fall back to Cerberus.
+    """
+    yaml, loader = _yaml_loader()
+    with open(schema_path, "rb") as f:
+        schema = yaml.load(f, Loader=loader)
+
+    checks = {field: _compile_field(definition) for field, definition in schema.items()}
+    if any(check is None for check in checks.values()):
+        from cerberus import Validator
+        validator = Validator(schema)
+        return lambda rule: {} if validator.validate(rule) else validator.errors
+
+    required = [field for field, definition in schema.items() if definition.get("required")]
+
+    def validate(rule):
+        if not isinstance(rule, dict):
+            return {"rule": ["must be of dict type"]}
+        errors = {field: ["required field"] for field in required if field not in rule}
+        for field, value in rule.items():
+            check = checks.get(field)
+            if check is None:
+                errors[field] = ["unknown field"]
+                continue
+            field_errors = check(value)
+            if field_errors:
+                errors[field] = field_errors
+        return errors
+
+    return validate
+
+
+# ----- Repository ----- #
+def _index_rule(repository, path, rule):
+    for index_name, field in INDEX_FIELDS.items():
+        values = rule.get(field)
+        if values is None:
+            continue
+        for value in values if isinstance(values, list) else [values]:
+            repository[index_name].setdefault(str(value), []).append(path)
+
+
+def load_rule_repository(rules_dir=RULES_DIR, schema_path=SCHEMA_PATH, cache_path=CACHE_PATH, workers=None):
+    """
+    Load every rule under `rules_dir` once and index it by name, tag, MITRE
+    technique, owner and cron. Schema errors and YAML errors are kept per path.
+    """
+    rules_dir = os.path.abspath(rules_dir)
+    paths = sorted(glob.glob(os.path.join(rules_dir, "**/*.yaml"), recursive=True))
+    entries = parse_rule_files(paths, cache_path, workers)
+    validate = compile_schema(schema_path) if schema_path else None
+
+    repository = {"rules": {}, "errors": {}, "schema_errors": {}}
+    repository.update({index_name: {} for index_name in INDEX_FIELDS})
+
+    for path in paths:
+        entry = entries[path]
+        if entry["error"]:
+            repository["errors"][path] = entry["error"]
+            continue
+        rule = entry["rule"] or {}
+        repository["rules"][path] = rule
+        if validate:
+            errors = validate(rule)
+            if errors:
+                repository["schema_errors"][path] = errors
+        if isinstance(rule, dict):
+            _index_rule(repository, path, rule)
+    return repository
+
+
+def find_rules(repository, name=None, tag=None, technique=None, owner=None, cron=None):
+    """
+    (path, rule) pairs matching every given criterion.
+    """
+    paths = set(repository["rules"])
+    for index_name, value in (("by_name", name), ("by_tag", tag), ("by_technique", technique),
+                              ("by_owner", owner), ("by_cron", cron)):
+        if value is not None:
+            paths &= set(repository[index_name].get(value, []))
+    return [(path, repository["rules"][path]) for path in sorted(paths)]
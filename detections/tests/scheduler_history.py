@@ -0,0 +1,294 @@
+import os
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+from collections import defaultdict
+from auth import load_requests
+from concurrency_plots import VIEWS, percentile, render_run_map
+from cron_testing import (
+    load_config, build_auth_header, get_scheduled_searches,
+    simulate_cron_runs, get_max_concurrent_limit
+)
+
+SCHEDULER_SEARCH = (
+    "search index=_internal sourcetype=scheduler savedsearch_name=* "
+    "| fields _time savedsearch_name status run_time dispatch_time scheduled_time"
+)
+
+RESERVOIR_SIZE = 512      # run_time samples kept per search
+LONG_RUN_SECONDS = 60     # the simulation assumes each run fits in one minute
+MAX_SPAN_MINUTES = 24 * 60
+
+
+# ----- Event Sources ----- #
+def _parse_export_lines(lines):
+    for line in lines:
+        if not line:
+            continue
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        try:
+            payload = json.loads(line)
+        except ValueError:
+            continue
+        result = payload.get("result")
+        if result:
+            yield result
+
+
+def stream_scheduler_events(config, headers, earliest="-24h", latest="now"):
+    """
+    Stream scheduler.log events from /services/search/jobs/export one at a
+    time, without holding the response in memory.
+    """
+    requests = load_requests()
+    url = f"{config['host']}/services/search/jobs/export"
+    data = {
+        "search": SCHEDULER_SEARCH,
+        "earliest_time": earliest,
+        "latest_time": latest,
+        "output_mode": "json"
+    }
+    with requests.post(url, headers=headers, data=data, verify=False, stream=True) as response:
+        if response.status_code != 200:
+            raise Exception(f"Failed to export scheduler logs:\n{response.text}")
+        yield from _parse_export_lines(response.iter_lines())
+
+
+def read_scheduler_events(export_path):
+    """
+    Replay a recorded export (one JSON object per line, as returned by
+    /services/search/jobs/export with output_mode=json).
+    """
+    with open(export_path, "r") as f:
+        yield from _parse_export_lines(line.strip() for line in f)
+
+
+# ----- Incremental Aggregation ----- #
+def new_history(seed=0):
+    return {
+        "searches": {},
+        "concurrency": defaultdict(int),
+        "events": 0,
+        "first": None,
+        "last": None,
+        "rng": random.Random(seed),
+    }
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def add_scheduler_event(history, event):
+    """
+    Fold one scheduler event into `history`. Memory stays bounded: run_time
+    is kept as a fixed-size reservoir sample per search, and concurrency is a
+    per-minute counter over the analysed window.
+    """
+    name = event.get("savedsearch_name")
+    if not name:
+        return
+    status = event.get("status", "unknown")
+    history["events"] += 1
+
+    # Track the time span covered so the simulation can be aligned to it
+    for key in ("scheduled_time", "dispatch_time"):
+        ts = _to_float(event.get(key))
+        if ts is not None:
+            history["first"] = ts if history["first"] is None else min(history["first"], ts)
+            history["last"] = ts if history["last"] is None else max(history["last"], ts)
+
+    stats = history["searches"].setdefault(name, {"statuses": defaultdict(int), "runs": 0, "runtimes": []})
+    stats["statuses"][status] += 1
+
+    run_time = _to_float(event.get("run_time"))
+    dispatch_time = _to_float(event.get("dispatch_time"))
+    if status != "success" or run_time is None:
+        return
+
+    # Reservoir sampling (Algorithm R) keeps a uniform sample of run times
+    stats["runs"] += 1
+    if len(stats["runtimes"]) < RESERVOIR_SIZE:
+        stats["runtimes"].append(run_time)
+    else:
+        slot = history["rng"].randrange(stats["runs"])
+        if slot < RESERVOIR_SIZE:
+            stats["runtimes"][slot] = run_time
+
+    if dispatch_time is None:
+        return
+    start = datetime.fromtimestamp(dispatch_time).replace(second=0, microsecond=0)
+    span = min(int((dispatch_time % 60 + run_time) // 60), MAX_SPAN_MINUTES)
+    for minute in range(span + 1):
+        history["concurrency"][start + timedelta(minutes=minute)] += 1
+
+
+def aggregate_scheduler_events(events, history=None):
+    history = history or new_history()
+    for event in events:
+        add_scheduler_event(history, event)
+    return history
+
+
+def summarize_searches(history):
+    """
+    Per-search skip/defer ratios and run_time percentiles.
+    """
+    summary = {}
+    for name, stats in history["searches"].items():
+        attempts = sum(stats["statuses"].values())
+        runtimes = sorted(stats["runtimes"])
+        summary[name] = {
+            "attempts": attempts,
+            "runs": stats["runs"],
+            "skip_ratio": stats["statuses"].get("skipped", 0) / attempts if attempts else 0.0,
+            "defer_ratio": stats["statuses"].get("deferred", 0) / attempts if attempts else 0.0,
+            "p50_runtime": percentile(runtimes, 50) if runtimes else None,
+            "p95_runtime": percentile(runtimes, 95) if runtimes else None,
+            "max_runtime": runtimes[-1] if runtimes else None,
+        }
+    return summary
+
+
+# ----- Model Comparison ----- #
+def compare_with_simulation(history, run_map, scheduled_names=None, tolerance=1):
+    """
+    Compare actual per-minute concurrency with the simulated run_map and
+    flag where the cron-only model is wrong.
+    """
+    actual = history["concurrency"]
+    minutes = set(actual) | set(run_map)
+    under = sorted((m, run_map.get(m, 0), actual[m]) for m in minutes if actual.get(m, 0) > run_map.get(m, 0) + tolerance)
+    over = sorted((m, run_map.get(m, 0), actual.get(m, 0)) for m in minutes if run_map.get(m, 0) > actual.get(m, 0) + tolerance)
+
+    summary = summarize_searches(history)
+    skipped = sorted(n for n, s in summary.items() if s["skip_ratio"] > 0 or s["defer_ratio"] > 0)
+    long_running = sorted(n for n, s in summary.items() if s["p95_runtime"] and s["p95_runtime"] > LONG_RUN_SECONDS)
+    never_ran = sorted(set(scheduled_names or []) - set(summary))
+    unscheduled = sorted(set(summary) - set(scheduled_names)) if scheduled_names is not None else []
+
+    return {
+        "under_predicted": under,
+        "over_predicted": over,
+        "skipped_or_deferred": skipped,
+        "long_running": long_running,
+        "never_ran": never_ran,
+        "not_in_model": unscheduled,
+    }
+
+
+def print_history_report(history, comparison, hard_limit, top=10):
+    summary = summarize_searches(history)
+    concurrency = history["concurrency"]
+
+    print(f"\n[i] Scheduler events processed: {history['events']}")
+    if concurrency:
+        counts = sorted(concurrency.values())
+        peak_minute = max(concurrency, key=lambda m: (concurrency[m], m))
+        print(f"[i] Actual concurrency p50/p95/max: {percentile(counts, 50)}/{percentile(counts, 95)}/{counts[-1]} "
+              f"(peak at {peak_minute.strftime('%Y-%m-%d %H:%M')}, limit {hard_limit})")
+
+    print(f"\n{'SEARCH':<40} {'RUNS':>6} {'SKIP%':>6} {'DEFER%':>6} {'P50 s':>8} {'P95 s':>8}")
+    print("-" * 80)
+    ranked = sorted(summary.items(), key=lambda item: (-item[1]["skip_ratio"], -(item[1]["p95_runtime"] or 0)))
+    for name, s in ranked[:top]:
+        p50 = f"{s['p50_runtime']:.1f}" if s["p50_runtime"] is not None else "-"
+        p95 = f"{s['p95_runtime']:.1f}" if s["p95_runtime"] is not None else "-"
+        print(f"{name[:40]:<40} {s['runs']:>6} {s['skip_ratio'] * 100:>6.1f} {s['defer_ratio'] * 100:>6.1f} {p50:>8} {p95:>8}")
+    print("-" * 80)
+
+    print(f"[!] Minutes busier than simulated: {len(comparison['under_predicted'])}")
+    for minute, simulated, actual in sorted(comparison["under_predicted"], key=lambda r: r[1] - r[2])[:top]:
+        print(f"  - {minute.strftime('%Y-%m-%d %H:%M')}: simulated {simulated}, actual {actual}")
+    print(f"[!] Minutes quieter than simulated: {len(comparison['over_predicted'])}")
+    if comparison["skipped_or_deferred"]:
+        print(f"[!] Searches skipped/deferred by the scheduler: {', '.join(comparison['skipped_or_deferred'])}")
+    if comparison["long_running"]:
+        print(f"[!] Searches with p95 run_time over {LONG_RUN_SECONDS}s (span several minutes): "
+              f"{', '.join(comparison['long_running'])}")
+    if comparison["never_ran"]:
+        print(f"[!] Scheduled but no runs logged: {', '.join(comparison['never_ran'])}")
+    if comparison["not_in_model"]:
+        print(f"[i] Logged but not in the simulated set: {', '.join(comparison['not_in_model'])}")
+
+
+def load_scheduled_searches(searches_path):
+    """
+    Scheduled searches saved as JSON, in the format returned by
+    cron_testing.get_scheduled_searches: [{"name", "cron", "disabled"}, ...].
+    """
+    with open(searches_path, "r") as f:
+        return json.load(f)
+
+
+def history_window(history, hours):
+    """
+    (start, hours) for the simulation: the span of the analysed events, or
+    the last `hours` when there were none.
+    """
+    if history["first"] is None:
+        return datetime.now() - timedelta(hours=hours), hours
+    # croniter returns runs strictly after its start, so begin just before the first event
+    start = datetime.fromtimestamp(history["first"]).replace(second=0, microsecond=0) - timedelta(seconds=1)
+    end = datetime.fromtimestamp(history["last"])
+    return start, (end - start).total_seconds() / 3600
+
+
+def analyze_scheduler_history(config_path: str = None, hours: int = 24, export_path: str = None,
+                              view: str = "text", save_path: str = None, searches_path: str = None,
+                              hard_limit: int = None, interactive: bool = False):
+    """
+    Aggregate what the scheduler actually did and compare it with the cron
+    simulation over the same time span. `export_path` replays a recorded export
+    instead of querying Splunk; with `searches_path` and `hard_limit` as well,
+    no connection to Splunk is made at all.
+    """
+    config = headers = None
+    if not (export_path and searches_path and hard_limit):
+        config = load_config(config_path)
+        headers = build_auth_header(config)
+
+    if export_path:
+        events = read_scheduler_events(export_path)
+    else:
+        events = stream_scheduler_events(config, headers, earliest=f"-{hours}h")
+    history = aggregate_scheduler_events(events)
+
+    searches = load_scheduled_searches(searches_path) if searches_path else get_scheduled_searches(config, headers)
+    start, window_hours = history_window(history, hours)
+    run_map = simulate_cron_runs(searches, window_hours, start=start)
+    hard_limit = hard_limit or get_max_concurrent_limit(config, headers)
+
+    comparison = compare_with_simulation(
+        history, run_map, [s["name"] for s in searches if s["cron"] and not s["disabled"]]
+    )
+    print_history_report(history, comparison, hard_limit)
+
+    if view != "text" and not save_path and not interactive:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        save_path = os.path.join("Pushes", f"scheduler_actual_load_{timestamp}.png")
+    render_run_map(history["concurrency"], hard_limit, int(hard_limit * 0.8), view=view,
+                   save_path=save_path, title="Actual Scheduled Search Concurrency", interactive=interactive,
+                   window=(start, start + timedelta(hours=window_hours)))
+    return history, comparison
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare scheduler.log history with the cron simulation.")
+    parser.add_argument("--config", default="config.json", help="Path to Splunk config JSON file")
+    parser.add_argument("--hours", type=int, default=24, help="History window in hours")
+    parser.add_argument("--replay", help="Recorded scheduler export (NDJSON) to analyse instead of querying Splunk")
+    parser.add_argument("--searches", help="Scheduled searches JSON to simulate instead of fetching them")
+    parser.add_argument("--limit", type=int, help="Concurrency hard limit instead of reading it from Splunk")
+    parser.add_argument("--view", choices=VIEWS, default="text", help="How to render actual concurrency")
+    parser.add_argument("--save", help="Path to write the chart image to")
+    parser.add_argument("--interactive", action="store_true", help="Open the chart in an interactive window")
+    args = parser.parse_args()
+
+    analyze_scheduler_history(args.config, args.hours, args.replay, args.view, args.save,
+                              args.searches, args.limit, args.interactive)
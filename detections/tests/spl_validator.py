@@ -1,6 +1,7 @@
-import requests
+from auth import load_requests
 
 def validate_spl(spl_query, config, headers):
+    requests = load_requests()
     search_str = f"search {spl_query}"
 
     # === First try: /parser endpoint ===
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from offline_eval import load_ndjson_columns, evaluate_rules
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SAMPLES_PATH = os.path.join(FIXTURES, "offline_samples.json")
+
+
+@pytest.fixture
+def table():
+    return load_ndjson_columns(SAMPLES_PATH)
+
+
+def run(table, search):
+    return evaluate_rules([("rule.yaml", {"name": "rule", "search": search})], table)[0]
+
+
+def count(table, search):
+    result = run(table, search)
+    assert result["error"] is None, result["error"]
+    return result["matches"]
+
+
+def test_or_binds_tighter_than_and(table):
+    # SPL reads this as (EventCode=3 OR EventCode=4624) AND User=alice
+    assert count(table, "EventCode=3 OR EventCode=4624 User=alice") == 1
+    assert count(table, "(EventCode=3 OR EventCode=4624) User=alice") == 1
+    assert count(table, "EventCode=3 OR (EventCode=4624 User=alice)") == 3
+
+
+def test_not_matches_events_missing_the_field(table):
+    assert count(table, "NOT DestinationPort=443") == 5
+    assert count(table, "DestinationPort!=443") == 1
+
+
+def test_wildcards_are_case_insensitive(table):
+    assert count(table, "Image=*cmd.exe") == 2
+    assert count(table, "Image=*\\System32\\*.EXE") == 4
+    assert count(table, "Image=*") == 5
+
+
+def test_quoted_values(table):
+    assert count(table, r'Image="C:\\Tools\\my tool.exe"') == 1
+    assert count(table, r'CommandLine="\"quoted\" arg"') == 1
+
+
+def test_stats_count_only_without_by(table):
+    assert count(table, "EventCode=1 | stats count") == 3
+    assert count(table, "search EventCode=1 | table User | search User=alice") == 1
+    assert "not supported" in run(table, "EventCode=1 | stats count by User")["error"]
+
+
+def test_free_text_matches_field_values(table):
+    assert count(table, "whoami") == 1
+    assert count(table, "*powershell*") == 1
+    # Field names are not part of any value
+    assert count(table, "DestinationPort") == 0
+
+
+def test_free_text_prefers_raw(tmp_path):
+    path = tmp_path / "raw.json"
+    path.write_text('{"_raw": "login ok for alice", "user": "bob"}\n'
+                    '{"_raw": "logout", "user": "alice"}\n')
+    table = load_ndjson_columns(str(path))
+    assert count(table, "alice") == 1
+    assert count(table, "user=alice") == 1
+
+
+def test_time_modifiers_and_metadata_are_ignored(table):
+    assert count(table, "index=sysmon EventCode=1 earliest=-24h latest=now") == 3
+
+
+@pytest.mark.parametrize("search", [
+    'Image IN ("*powershell.exe", "*cmd.exe")',
+    "TERM(cmd.exe)",
+    "`sysmon` EventCode=1",
+    "EventCode>1",
+    "| tstats count",
+])
+def test_unsupported_syntax_is_reported(table, search):
+    result = run(table, search)
+    assert result["matches"] is None
+    assert result["error"]
@@ -0,0 +1,86 @@
+import os
+import json
+
+import pytest
+
+from rule_repository import compile_schema, parse_rule_files, CACHE_VERSION
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rule_schema.yaml")
+
+BASE_RULE = {
+    "name": "Test Rule",
+    "search": "index=main EventCode=1",
+    "cron": "*/5 * * * *",
+    "earliest_time": "-5m",
+    "latest_time": "now",
+    "alert_type": "always",
+}
+
+# Values probed against every schema field, covering null, bool-as-int,
+# wrong types, out-of-range numbers, unallowed values and bad list items
+PROBE_VALUES = [None, True, False, 0, 1, 3, 7, 2.5, "", "x", "always", "table", "high",
+                [], ["a"], ["a", None, 3], {}, {"a": 1}]
+
+
+@pytest.fixture(scope="module")
+def validators():
+    yaml = pytest.importorskip("yaml")
+    cerberus = pytest.importorskip("cerberus")
+    with open(SCHEMA_PATH, "r") as f:
+        schema = yaml.safe_load(f)
+    reference = cerberus.Validator(schema)
+
+    def cerberus_errors(rule):
+        return {} if reference.validate(rule) else reference.errors
+
+    return compile_schema(SCHEMA_PATH), cerberus_errors, list(schema)
+
+
+def probe_rules():
+    yield dict(BASE_RULE)
+    for field in BASE_RULE:
+        yield {k: v for k, v in BASE_RULE.items() if k != field}
+    yield dict(BASE_RULE, unknown_field="x")
+    yield dict(BASE_RULE, unknown_field=None)
+
+
+def test_compiled_schema_matches_cerberus(validators):
+    compiled, cerberus_errors, fields = validators
+
+    rules = list(probe_rules())
+    rules += [dict(BASE_RULE, **{field: value}) for field in fields for value in PROBE_VALUES]
+    for rule in rules:
+        assert compiled(rule) == cerberus_errors(rule), rule
+
+
+def write_rules(tmp_path):
+    dated = tmp_path / "dated.yaml"
+    dated.write_text("name: Dated\ndate: 2024-01-01\n")
+    plain = tmp_path / "plain.yaml"
+    plain.write_text("name: Plain\ntags: [a, b]\n")
+    return str(dated), str(plain)
+
+
+def test_cache_keeps_serializable_entries(tmp_path):
+    pytest.importorskip("yaml")
+    dated, plain = write_rules(tmp_path)
+    cache_path = str(tmp_path / "cache.json")
+
+    entries = parse_rule_files([dated, plain], cache_path)
+    assert entries[plain]["rule"] == {"name": "Plain", "tags": ["a", "b"]}
+    with open(cache_path, "r") as f:
+        cached = json.load(f)["entries"]
+    # The date can't be stored as JSON, so only that file is left out
+    assert set(cached) == {plain}
+    assert parse_rule_files([dated, plain], cache_path)[dated]["rule"]["name"] == "Dated"
+
+
+def test_malformed_cache_entry_is_a_miss(tmp_path):
+    pytest.importorskip("yaml")
+    _, plain = write_rules(tmp_path)
+    cache_path = tmp_path / "cache.json"
+    cache_path.write_text(json.dumps({"version": CACHE_VERSION, "entries": {plain: {"size": 1}}}))
+
+    entries = parse_rule_files([plain], str(cache_path))
+    assert entries[plain]["rule"]["name"] == "Plain"
+    assert entries[plain]["error"] is None
@@ -0,0 +1,69 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from scheduler_history import (
+    read_scheduler_events, aggregate_scheduler_events, summarize_searches,
+    analyze_scheduler_history, history_window
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+EXPORT_PATH = os.path.join(FIXTURES, "scheduler_export.json")
+SEARCHES_PATH = os.path.join(FIXTURES, "scheduled_searches.json")
+
+# 2026-01-01 00:00:00 UTC, the first scheduled_time in the fixture
+BASE = 1767225600
+
+
+def minute(offset):
+    return datetime.fromtimestamp(BASE) + timedelta(minutes=offset)
+
+
+@pytest.fixture
+def history():
+    return aggregate_scheduler_events(read_scheduler_events(EXPORT_PATH))
+
+
+def test_skip_and_defer_ratios(history):
+    summary = summarize_searches(history)
+    assert history["events"] == 8
+    assert summary["Hourly Check"]["skip_ratio"] == pytest.approx(1 / 3)
+    assert summary["Hourly Check"]["defer_ratio"] == 0
+    assert summary["Five Min"]["skip_ratio"] == 0
+    assert summary["Five Min"]["defer_ratio"] == pytest.approx(0.25)
+    assert summary["Ghost"]["skip_ratio"] == 1.0
+
+
+def test_runtime_percentiles(history):
+    summary = summarize_searches(history)
+    assert summary["Hourly Check"]["runs"] == 2
+    assert (summary["Hourly Check"]["p50_runtime"], summary["Hourly Check"]["p95_runtime"]) == (10, 20)
+    assert summary["Five Min"]["runs"] == 3
+    assert (summary["Five Min"]["p50_runtime"], summary["Five Min"]["p95_runtime"]) == (50, 130)
+    assert summary["Ghost"]["p50_runtime"] is None
+
+
+def test_per_minute_concurrency(history):
+    # The 130s run starting at 00:05:00 occupies three minutes; the 50s run
+    # dispatched at 00:15:30 crosses into 00:16.
+    expected = {minute(0): 2, minute(5): 1, minute(6): 1, minute(7): 1,
+                minute(15): 1, minute(16): 1, minute(60): 1}
+    assert dict(history["concurrency"]) == expected
+
+
+def test_window_follows_event_span(history):
+    start, hours = history_window(history, 24)
+    assert start == minute(0) - timedelta(seconds=1)
+    assert hours == pytest.approx(2 + 1 / 3600)
+
+
+def test_replay_needs_no_splunk(history):
+    pytest.importorskip("croniter")
+    _, comparison = analyze_scheduler_history(
+        export_path=EXPORT_PATH, searches_path=SEARCHES_PATH, hard_limit=5, view="text"
+    )
+    assert comparison["never_ran"] == ["Never Ran"]
+    assert comparison["not_in_model"] == ["Ghost"]
+    assert comparison["skipped_or_deferred"] == ["Five Min", "Ghost", "Hourly Check"]
+    assert comparison["long_running"] == ["Five Min"]
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# Entry points and the arguments that exercise only their startup path
+ENTRY_POINTS = [
+    ["Splunk-Manager.py", "--help"],
+    [os.path.join("detections", "tests", "validation_script_main.py"), "--help"],
+    [os.path.join("detections", "tests", "scheduler_history.py"), "--help"],
+    [os.path.join("detections", "tests", "offline_eval.py"), "--help"],
+    [os.path.join("detections", "scripts", "cron-rebalance.py"), "--help"],
+]
+
+# Packages that must only load once a code path needs them
+HEAVY_MODULES = {"matplotlib", "requests", "urllib3", "yaml", "croniter", "cerberus", "splunklib", "numpy"}
+
+# Wall-clock import time includes the interpreter and stdlib, so the budget is
+# only a coarse regression guard for shared runners; the heavy-module check is
+# the real gate. Override with STARTUP_BUDGET_MS.
+BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", 1000))
+
+
+def measure_imports(entry_point):
+    """
+    Run an entry point under `python -X importtime` and return
+    (total import time in ms, {top-level module: cumulative ms}).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + entry_point,
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    total_us = 0
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total_us += int(self_us)
+        if not name.startswith("  "):
+            top = name.strip().split(".")[0]
+            modules[top] = modules.get(top, 0) + int(cumulative_us) / 1000
+    return total_us / 1000, modules
+
+
+@pytest.mark.parametrize("entry_point", ENTRY_POINTS, ids=lambda ep: os.path.basename(ep[0]))
+def test_startup_imports(entry_point):
+    total_ms, modules = measure_imports(entry_point)
+    heavy = sorted(HEAVY_MODULES & set(modules))
+    assert not heavy, f"Heavy modules imported at startup: {', '.join(heavy)}"
+
+    slowest = ", ".join(f"{name} {ms:.1f} ms" for name, ms in sorted(modules.items(), key=lambda i: -i[1])[:5])
+    assert total_ms <= BUDGET_MS, f"Startup imports took {total_ms:.1f} ms (budget {BUDGET_MS} ms): {slowest}"
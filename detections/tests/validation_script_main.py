@@ -1,15 +1,13 @@
 import os
 import sys
-import glob
-import yaml
 import json
+import argparse
 from datetime import datetime, timedelta
-from croniter import croniter
-from collections import defaultdict
-from cerberus import Validator
 from auth import get_session_key
 from spl_validator import validate_spl
 from spl_linter import lint_spl
+from offline_eval import load_ndjson_columns, evaluate_rules
+from rule_repository import load_rule_repository
 from volume_testing import test_alert_volume
 from cron_testing import simulate_cron_runs, get_scheduled_searches, get_max_concurrent_limit
 
@@ -20,14 +18,6 @@ CONFIG_PATH = os.path.join(BASE_DIR, "config.json")
 SCHEMA_PATH = os.path.join(BASE_DIR, "detections", "tests", "rule_schema.yaml")
 RULES_DIR = os.path.join(BASE_DIR, "detections", "rules")
 
-with open(CONFIG_PATH, "r") as f:
-    CONFIG = json.load(f)
-
-with open(SCHEMA_PATH, "r") as f:
-    SCHEMA = yaml.safe_load(f)
-
-v = Validator(SCHEMA)
-
 # === RULE VALIDATOR ===
 def validate_detection_rule(rule, config, headers):
     spl = rule.get("search", "")
@@ -84,6 +74,7 @@ def is_cron_push_safe(new_cron, config, headers, buffer=1):
     run_map = simulate_cron_runs(scheduled)
 
     # Include new rule's cron in simulation
+    from croniter import croniter
     now = datetime.now()
     end = now + timedelta(hours=24)
     try:
@@ -116,24 +107,58 @@ def is_cron_push_safe(new_cron, config, headers, buffer=1):
 
 # === MAIN ===
 def main():
-    headers = get_session_key(CONFIG)
+    parser = argparse.ArgumentParser(description="Validate detection rules.")
+    parser.add_argument("--schema-only", action="store_true",
+                        help="Only check rule YAML against rule_schema.yaml; no Splunk access")
+    parser.add_argument("--samples", help="NDJSON sample events for an offline match pre-screen (e.g. sample_logs.json)")
+    args = parser.parse_args()
+
+    repository = load_rule_repository(RULES_DIR, SCHEMA_PATH)
+
+    # Offline pre-screen: score every rule against the samples in one pass
+    # before any remote test runs
+    offline_results = {}
+    if args.samples:
+        samples = load_ndjson_columns(args.samples)
+        scored = [(path, rule) for path, rule in repository["rules"].items() if isinstance(rule, dict)]
+        offline_results = {r["path"]: r for r in evaluate_rules(scored, samples)}
+    headers = None
+    config = None
+    if not args.schema_only:
+        with open(CONFIG_PATH, "r") as f:
+            config = json.load(f)
+        headers = get_session_key(config)
+
     valid_count = 0
     invalid_count = 0
 
-    for file in glob.glob(os.path.join(RULES_DIR, "**/*.yaml"), recursive=True):
-        with open(file, "r") as f:
-            rule = yaml.safe_load(f)
+    for file, error in repository["errors"].items():
         print(f"\n[>>] Validating rule: {file}")
+        print(f"[!] {error}")
+        invalid_count += 1
 
-        if not v.validate(rule):
+    for file, rule in repository["rules"].items():
+        print(f"\n[>>] Validating rule: {file}")
+
+        schema_errors = repository["schema_errors"].get(file)
+        if schema_errors:
             print("[!] Invalid YAML schema:")
-            for field, errors in v.errors.items():
+            for field, errors in schema_errors.items():
                 print(f"  - {field}: {errors}")
             invalid_count += 1
             continue
         print("[+] YAML schema valid")
 
-        if validate_detection_rule(rule, CONFIG, headers):
+        offline = offline_results.get(file)
+        if offline:
+            if offline["error"]:
+                print(f"[i] Offline pre-screen skipped: {offline['error']}")
+            else:
+                print(f"[i] Offline sample matches: {offline['matches']} of {samples['count']} events")
+
+        if args.schema_only:
+            valid_count += 1
+        elif validate_detection_rule(rule, config, headers):
             valid_count += 1
         else:
             invalid_count += 1
@@ -1,7 +1,8 @@
-import requests
 import json
+from auth import load_requests
 
 def test_alert_volume(spl, config, headers, earliest="-14d@d", latest="now"):
+    requests = load_requests()
     url = f"{config['host']}/services/search/jobs/export"
 
     wrapped_spl = spl.strip()